@@ -0,0 +1,133 @@
+# CASCADE CLASSIFIER - Cheap symbolic rules first, neural network only for leftovers
+import time
+
+import numpy as np
+
+import profiling
+from neural_network import NeuralNetwork
+from shape_records import ShapeRecordArray
+from symbolic_ai import SymbolicAI
+
+RULES, NETWORK = 0, 1
+
+
+class CascadeClassifier:
+    """Run SymbolicAI on the whole batch, send only inconclusive rows to the network"""
+
+    def __init__(self, symbolic=None, network=None, threshold=None):
+        self.symbolic = symbolic or SymbolicAI()
+        self.network = network or NeuralNetwork()
+        # Rule confidence needed to skip the network (defaults to the rule threshold)
+        self.threshold = self.symbolic.threshold if threshold is None else threshold
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {'inputs': 0, 'rule_hits': 0, 'network_calls': 0}
+
+    @property
+    def hit_rates(self):
+        """Fraction of inputs answered by each stage"""
+        total = self.stats['inputs'] or 1
+        return {'rules': self.stats['rule_hits'] / total,
+                'network': self.stats['network_calls'] / total}
+
+    def _network_proba(self, features):
+        if hasattr(self.network, 'predict_proba'):
+            return self.network.predict_proba(features)
+        return self.network.forward(features)
+
+    def classify(self, shape_properties, features):
+        """Single input: (shape, confidence, stage)"""
+        shape, confidence = self.symbolic.classify(shape_properties)
+        self.stats['inputs'] += 1
+        if confidence >= self.threshold:
+            self.stats['rule_hits'] += 1
+            return shape, confidence, RULES
+        self.stats['network_calls'] += 1
+        shape, confidence = self.network.classify(features)
+        return shape, confidence, NETWORK
+
+    def classify_batch(self, records, features):
+        """Batch of aligned records/feature rows -> (names, confidences, stages)"""
+        if not isinstance(records, ShapeRecordArray):
+            records = ShapeRecordArray.from_records(records)
+        features = np.asarray(features)
+        if len(records) != len(features):
+            raise ValueError(f"{len(records)} records but {len(features)} feature rows")
+
+        with profiling.stage('cascade.rules'):
+            names, confidences = self.symbolic.classify_batch(records)
+
+        # Gather only the rows the rules could not settle
+        fallback = np.flatnonzero(confidences < self.threshold)
+        stages = np.full(len(records), RULES, dtype=np.int8)
+        if len(fallback):
+            with profiling.stage('cascade.network'):
+                probabilities = self._network_proba(features[fallback])
+            # Scatter network answers back into their original positions
+            predictions = probabilities.argmax(axis=1)
+            names[fallback] = np.array(self.network.classes, dtype=object)[predictions]
+            confidences[fallback] = probabilities[np.arange(len(fallback)), predictions] * 100
+            stages[fallback] = NETWORK
+
+        self.stats['inputs'] += len(records)
+        self.stats['rule_hits'] += len(records) - len(fallback)
+        self.stats['network_calls'] += len(fallback)
+        return names, confidences, stages
+
+
+def benchmark_cascade(n=200_000, rule_hit_rate=0.9, repeats=3, seed=0):
+    """Rows/sec of the cascade vs. always running both classifiers"""
+    rng = np.random.RandomState(seed)
+    known = [
+        {'corners': 4, 'equal_sides': True, 'angles': 90},
+        {'corners': 0, 'curves': True, 'symmetry': 'radial'},
+        {'corners': 3, 'angles_sum': 180},
+    ]
+    unknown = {'corners': 5, 'angles': 108}
+    picks = rng.randint(0, len(known), n)
+    is_known = rng.rand(n) < rule_hit_rate
+    records = ShapeRecordArray.from_records(
+        known[p] if k else unknown for p, k in zip(picks, is_known))
+    features = rng.rand(n, 8)
+
+    cascade = CascadeClassifier()
+
+    def both():
+        cascade.symbolic.classify_batch(records)
+        cascade.network.predict_proba(features)
+
+    def timed(func):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            func()
+        return n * repeats / (time.perf_counter() - start)
+
+    both_rate = timed(both)
+    cascade_rate = timed(lambda: cascade.classify_batch(records, features))
+    return {'always_both': both_rate, 'cascade': cascade_rate,
+            'speedup': cascade_rate / both_rate, 'hit_rates': cascade.hit_rates}
+
+
+if __name__ == "__main__":
+    # Example usage
+    cascade = CascadeClassifier()
+    records = [
+        {'corners': 4, 'equal_sides': True, 'angles': 90},
+        {'corners': 5, 'angles': 108},
+        {'corners': 3, 'angles_sum': 180},
+    ]
+    features = np.array([
+        [0.9, 0.1, 0.9, 0.9, 0.2, 0.1, 0.9, 0.8],
+        [0.8, 0.2, 0.8, 0.7, 0.4, 0.3, 0.7, 0.6],
+        [0.7, 0.2, 0.7, 0.6, 0.3, 0.2, 0.7, 0.5],
+    ])
+    names, confidences, stages = cascade.classify_batch(records, features)
+    for name, confidence, stage in zip(names, confidences, stages):
+        source = "rules" if stage == RULES else "network"
+        print(f"Prediction: {name} ({confidence:.1f}% confidence, {source})")
+
+    result = benchmark_cascade()
+    print(f"\nAlways both: {result['always_both']:,.0f} rows/sec")
+    print(f"Cascade:     {result['cascade']:,.0f} rows/sec ({result['speedup']:.2f}x)")
+    print(f"Hit rates:   {result['hit_rates']}")
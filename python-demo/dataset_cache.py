@@ -0,0 +1,241 @@
+# DATASET CACHE - Columnar on-disk copy of a CSV so repeat runs skip text parsing
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (enables Parquet/Feather)
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+MANIFEST = 'manifest.json'
+# Bumped whenever the on-disk layout changes, so older caches are rebuilt
+CACHE_VERSION = 3
+FORMATS = ('parquet', 'feather', 'npy')
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir(csv_path):
+    """<csv dir>/.dataset_cache/<csv name>/"""
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, '.dataset_cache', name)
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _is_fresh(manifest, csv_path, cache_dir, options):
+    """Size + mtime match is enough; a touched-but-identical file is confirmed by hash"""
+    if manifest is None or manifest.get('options') != options:
+        return False
+    stat = os.stat(csv_path)
+    if manifest['size'] != stat.st_size:
+        return False
+    if manifest['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if manifest['hash'] != file_hash(csv_path):
+        return False
+    manifest['mtime_ns'] = stat.st_mtime_ns
+    _write_manifest(cache_dir, manifest)
+    return True
+
+
+def _cacheable(df):
+    """Every column is a plain NumPy dtype or text, so it reads back identically
+
+    Extension dtypes (Int64, category, string, tz-aware dates) and object
+    columns holding anything but strings are not round-tripped.
+    """
+    if any(not isinstance(c, str) for c in df.columns) or not df.columns.is_unique:
+        return False
+    for column in df.columns:
+        dtype = df[column].dtype
+        # pandas >= 3 reads text as the NaN-backed str dtype; treat it like object
+        default_str = isinstance(dtype, pd.StringDtype) and dtype.na_value is not pd.NA
+        if not (isinstance(dtype, np.dtype) or default_str):
+            return False
+        text = dtype == object or default_str
+        if text and pd.api.types.infer_dtype(df[column], skipna=True) not in ('string', 'empty'):
+            return False
+    return True
+
+
+def _flatten_index(df):
+    """Move a non-default index into columns -> (frame, index columns, index names)"""
+    index = df.index
+    if (isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1
+            and index.name is None):
+        return df, [], []
+    names = list(df.index.names)
+    flat = df.reset_index()
+    return flat, list(flat.columns[:len(names)]), names
+
+
+def _write_frame(df, directory, fmt):
+    if fmt == 'parquet':
+        df.to_parquet(os.path.join(directory, 'data.parquet'), index=False)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(os.path.join(directory, 'data.feather'))
+    else:
+        # One .npy per column; text columns become fixed-width unicode (no pickle)
+        # plus a colN.null.npy mask, since missing values would otherwise become 'nan'
+        for i, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            if values.dtype == object:
+                missing = pd.isna(values)
+                values = np.where(missing, '', values).astype(str)
+                np.save(os.path.join(directory, f'col{i}.null.npy'), missing, allow_pickle=False)
+            np.save(os.path.join(directory, f'col{i}.npy'), values, allow_pickle=False)
+
+
+def _read_frame(directory, fmt, manifest, columns):
+    """Cached frame with `columns` (all when None) and the original index"""
+    index_columns = manifest['index_columns']
+    if columns is None:
+        wanted = [c for c in manifest['columns'] if c not in index_columns]
+    else:
+        wanted = list(columns)
+    df = _read_columns(directory, fmt, manifest['columns'], index_columns + wanted)
+    if index_columns:
+        df = df.set_index(index_columns)
+        df.index.names = manifest['index_names']
+    return df
+
+
+def _read_columns(directory, fmt, all_columns, wanted):
+    if fmt == 'parquet':
+        return pd.read_parquet(os.path.join(directory, 'data.parquet'), columns=wanted)
+    if fmt == 'feather':
+        return pd.read_feather(os.path.join(directory, 'data.feather'), columns=wanted)
+    data = {}
+    for column in wanted:
+        path = os.path.join(directory, f'col{all_columns.index(column)}')
+        values = np.load(path + '.npy', allow_pickle=False)
+        if values.dtype.kind == 'U':
+            values = values.astype(object)
+            values[np.load(path + '.null.npy', allow_pickle=False)] = np.nan
+        data[column] = values
+    return pd.DataFrame(data, columns=wanted)
+
+
+def load_csv_cached(csv_path, columns=None, cache_dir=None, fmt=None, **read_csv_kwargs):
+    """pd.read_csv() with a columnar cache keyed by the CSV's size, mtime and hash
+
+    The first call parses the CSV and writes every column to the cache; later
+    calls read only `columns` from it. Any change to the CSV (or to the
+    read_csv options) rebuilds the cache. `fmt` defaults to Parquet when
+    pyarrow is installed and to a directory of .npy files otherwise.
+    A non-default index (index_col=...) is stored as columns and restored.
+    Frames the cache cannot reproduce exactly (extension dtypes such as
+    dtype='Int64' or 'category', non-text object columns) are returned
+    from read_csv without being cached.
+    """
+    fmt = fmt or ('parquet' if HAVE_PYARROW else 'npy')
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}, got {fmt!r}")
+    if fmt != 'npy' and not HAVE_PYARROW:
+        raise ImportError(f"the {fmt} cache format requires pyarrow")
+    cache_dir = cache_dir or default_cache_dir(csv_path)
+    columns = list(columns) if columns is not None else None
+    options = {'version': CACHE_VERSION, 'fmt': fmt,
+               'read_csv': repr(sorted(read_csv_kwargs.items()))}
+
+    manifest = _read_manifest(cache_dir)
+    if _is_fresh(manifest, csv_path, cache_dir, options):
+        try:
+            return _read_frame(cache_dir, fmt, manifest, columns)
+        except (OSError, ValueError, KeyError):
+            pass  # damaged cache, rebuild below
+
+    stat = os.stat(csv_path)
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    try:
+        flat, index_columns, index_names = _flatten_index(df)
+    except ValueError:  # index name clashes with a column
+        flat = None
+    if flat is None or len(index_columns) == len(flat.columns) or not _cacheable(flat):
+        return df[columns] if columns is not None else df
+
+    # Build in a sibling temp dir and swap it in, so readers never see half a cache
+    staging = None
+    try:
+        parent = os.path.dirname(os.path.abspath(cache_dir))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix='.staging-')
+        _write_frame(flat, staging, fmt)
+        _write_manifest(staging, {
+            'source': os.path.abspath(csv_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': file_hash(csv_path),
+            'columns': list(flat.columns),
+            'index_columns': index_columns,
+            'index_names': index_names,
+            'options': options,
+        })
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(staging, cache_dir)
+    except Exception:
+        # The parse already succeeded; a failed cache write only costs the next run
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    return df[columns] if columns is not None else df
+
+
+if __name__ == "__main__":
+    # Example usage: missing text, an index and typed columns survive the cache unchanged
+    directory = tempfile.mkdtemp()
+    csv_path = os.path.join(directory, 'weather.csv')
+    with open(csv_path, 'w') as f:
+        f.write('DATE,STATION,TMAX\n20240101,KSEA,8.5\n20240102,,\n20240103,nan,7.0\n')
+
+    def same(a, b):
+        try:
+            pd.testing.assert_frame_equal(a, b)
+            return True
+        except AssertionError:
+            return False
+
+    variants = {
+        'default': {},
+        'index_col': {'index_col': 'DATE'},
+        'Int64': {'dtype': {'DATE': 'Int64'}},
+        'category': {'dtype': {'STATION': 'category'}},
+    }
+    for fmt in [f for f in FORMATS if f == 'npy' or HAVE_PYARROW]:
+        for name, kwargs in variants.items():
+            cache_dir = os.path.join(directory, fmt, name)
+            parsed = load_csv_cached(csv_path, cache_dir=cache_dir, fmt=fmt, **kwargs)
+            cached = load_csv_cached(csv_path, cache_dir=cache_dir, fmt=fmt, **kwargs)
+            subset = load_csv_cached(csv_path, ['TMAX'], cache_dir=cache_dir, fmt=fmt, **kwargs)
+            print(f"{fmt:<8} {name:<10} equals read_csv: "
+                  f"{same(parsed, pd.read_csv(csv_path, **kwargs)) and same(cached, parsed)} "
+                  f"(cached: {os.path.exists(os.path.join(cache_dir, MANIFEST))}, "
+                  f"column subset ok: {same(subset, parsed[['TMAX']])})")
+    shutil.rmtree(directory)
@@ -0,0 +1,163 @@
+# STACKED ENSEMBLE - Evaluate K networks with one batched matmul per layer
+import time
+
+import numpy as np
+
+from neural_network import ACTIVATIONS, DeepNetwork, NeuralNetwork
+
+
+def network_layers(network):
+    """[(weights, bias, activation), ...] for either network type
+
+    A NeuralNetwork's output layer is folded into a softmax with its
+    temperature, so its ensemble output matches predict_proba().
+    """
+    if isinstance(network, DeepNetwork):
+        return list(network.layers)
+    return [
+        (network.weights_input_hidden, network.bias_hidden, 'sigmoid'),
+        (network.weights_hidden_output / network.temperature,
+         network.bias_output / network.temperature, 'softmax'),
+    ]
+
+
+class NetworkEnsemble:
+    """K networks with the same input size, output size and activations
+
+    Weights are stacked into (K, fan_in, fan_out) arrays. Hidden layers of
+    different widths are zero-padded to the widest member: a padded unit has
+    zero outgoing weights, so it never changes the next layer. That only holds
+    for element-wise activations; a hidden softmax would share its mass with
+    the padding, so such layers must have the same width in every member.
+    """
+
+    def __init__(self, networks):
+        if not networks:
+            raise ValueError("an ensemble needs at least one network")
+        per_model = [network_layers(network) for network in networks]
+        depth = len(per_model[0])
+        activations = [activation for _, _, activation in per_model[0]]
+        for layers in per_model[1:]:
+            if [activation for _, _, activation in layers] != activations or len(layers) != depth:
+                raise ValueError("ensemble members need the same depth and activations")
+            if (layers[0][0].shape[0] != per_model[0][0][0].shape[0]
+                    or layers[-1][0].shape[1] != per_model[0][-1][0].shape[1]):
+                raise ValueError("ensemble members need the same input and output sizes")
+
+        for i, activation in enumerate(activations[:-1]):
+            widths = {layers[i][0].shape[1] for layers in per_model}
+            if activation == 'softmax' and len(widths) > 1:
+                raise ValueError(f"hidden layer {i} uses softmax, so every member needs "
+                                 f"the same width there, got {sorted(widths)}")
+
+        dtype = np.result_type(*[w for layers in per_model for w, _, _ in layers])
+        self.layers = []
+        for i, activation in enumerate(activations):
+            fan_in = max(layers[i][0].shape[0] for layers in per_model)
+            fan_out = max(layers[i][0].shape[1] for layers in per_model)
+            weights = np.zeros((len(networks), fan_in, fan_out), dtype=dtype)
+            bias = np.zeros((len(networks), 1, fan_out), dtype=dtype)
+            for k, layers in enumerate(per_model):
+                w, b, _ = layers[i]
+                weights[k, :w.shape[0], :w.shape[1]] = w
+                bias[k, 0, :b.shape[0]] = b
+            self.layers.append((weights, bias, activation))
+        self.classes = list(networks[0].classes)
+        self._buffers = None
+
+    def __len__(self):
+        return self.layers[0][0].shape[0]
+
+    def _ping_pong(self, n):
+        """Two flat (K * N * widest layer) scratch buffers, reused across calls"""
+        size = len(self) * n * max(weights.shape[2] for weights, _, _ in self.layers)
+        if self._buffers is None or self._buffers[0].size < size:
+            dtype = self.layers[0][0].dtype
+            self._buffers = (np.empty(size, dtype=dtype), np.empty(size, dtype=dtype))
+        return self._buffers
+
+    def forward(self, features):
+        """(N, features) -> (K, N, classes) per-model outputs"""
+        x = np.atleast_2d(np.asarray(features, dtype=self.layers[0][0].dtype))
+        n = len(x)
+        buffers = self._ping_pong(n)
+        x = x[None]  # broadcast the batch across all K models
+        for i, (weights, bias, activation) in enumerate(self.layers):
+            k, _, fan_out = weights.shape
+            out = buffers[i % 2][:k * n * fan_out].reshape(k, n, fan_out)
+            np.matmul(x, weights, out=out)
+            out += bias
+            ACTIVATIONS[activation](out)
+            x = out
+        return x.copy()
+
+    def predict(self, features, method='mean'):
+        """Combined class index per row plus the (K, N, classes) per-model outputs
+
+        'mean' averages the model outputs; 'vote' takes the majority of the
+        per-model argmax (ties go to the lower class index).
+        """
+        outputs = self.forward(features)
+        if method == 'mean':
+            combined = outputs.mean(axis=0)
+        elif method == 'vote':
+            votes = outputs.argmax(axis=2)
+            combined = (votes[..., None] == np.arange(outputs.shape[2])).sum(axis=0)
+        else:
+            raise ValueError(f"method must be 'mean' or 'vote', got {method!r}")
+        return combined.argmax(axis=1), outputs
+
+    def predict_proba(self, features):
+        """Mean of the members' class probabilities, (N, classes)"""
+        return self.forward(features).mean(axis=0)
+
+
+def benchmark_ensemble(sizes=(1, 2, 4, 8, 16, 32), batch_size=1024, repeats=20):
+    """Model-rows/sec (rows x K per second) of the stacked ensemble vs. a Python loop
+
+    Once model-rows/sec stops growing with K the matmuls are compute-bound:
+    each extra member then costs its full FLOPs and ensemble rows/sec falls
+    as 1/K. Stacking only helps before that point, where the loop pays
+    per-call overhead (small batches); at large batches both are compute-bound
+    from K=1.
+    """
+    features = np.random.rand(batch_size, 8)
+    results = {}
+    for k in sizes:
+        networks = [DeepNetwork([8, 32, 32, 3], activation='relu', seed=seed, dtype=np.float64)
+                    for seed in range(k)]
+        ensemble = NetworkEnsemble(networks)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            ensemble.forward(features)
+        stacked = k * batch_size * repeats / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            np.mean([network.forward(features) for network in networks], axis=0)
+        looped = k * batch_size * repeats / (time.perf_counter() - start)
+        results[k] = (stacked, looped)
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage: same architecture, different hidden sizes and temperatures
+    networks = [NeuralNetwork(8, hidden) for hidden in (3, 5, 7)]
+    for network, temperature in zip(networks, (1.0, 0.5, 2.0)):
+        network.temperature = temperature
+    ensemble = NetworkEnsemble(networks)
+
+    features = np.array([[0.9, 0.1, 0.9, 0.9, 0.2, 0.1, 0.9, 0.8],
+                         [0.1, 0.9, 0.2, 0.1, 0.8, 0.9, 0.1, 0.2]])
+    labels, outputs = ensemble.predict(features)
+    print(f"Mean: {[ensemble.classes[i] for i in labels]}")
+    labels, _ = ensemble.predict(features, method='vote')
+    print(f"Vote: {[ensemble.classes[i] for i in labels]}")
+    # Per-model outputs match each member's own predict_proba
+    print(np.allclose(outputs[1], networks[1].predict_proba(features), atol=1e-6))
+
+    for batch_size in (64, 1024):
+        print(f"\n{f'Batch {batch_size}':<11} {'model-rows/s':>12} {'loop':>12} {'rows/s':>12}")
+        for k, (stacked, looped) in benchmark_ensemble(batch_size=batch_size).items():
+            print(f"  K={k:<7} {stacked:>12,.0f} {looped:>12,.0f} {stacked / k:>12,.0f}")
@@ -0,0 +1,138 @@
+# INCREMENTAL RULE MATCHING - Rete-style re-evaluation for streams of property updates
+import bisect
+from collections import namedtuple
+
+from symbolic_ai import SymbolicAI
+
+# Emitted whenever a shape's (label, confidence) changes
+ClassificationChanged = namedtuple(
+    'ClassificationChanged', 'shape_id old_label old_confidence new_label new_confidence')
+
+
+class _ShapeState:
+    __slots__ = ('values', 'matches', 'passing', 'label', 'confidence')
+
+    def __init__(self, rule_count):
+        self.values = {}
+        self.matches = [0] * rule_count   # satisfied conditions per rule
+        self.passing = []                 # sorted indices of rules over threshold
+        self.label = "unknown"
+        self.confidence = 0
+
+
+class IncrementalMatcher:
+    """Keeps per-shape, per-rule match counts and updates only what a change touches
+
+    Conditions are indexed by property and expected value, so an update visits
+    just the rules whose condition on that property flips (the ones expecting
+    the old value and the ones expecting the new one). The winner is the first
+    passing rule in rulebase order, same as SymbolicAI.classify.
+    """
+
+    def __init__(self, symbolic=None):
+        symbolic = symbolic or SymbolicAI()
+        self.shape_names = list(symbolic.rules)
+        self.rule_sizes = [len(rules) for rules in symbolic.rules.values()]
+        self.threshold = symbolic.threshold
+        # property -> expected value -> [rule index, ...]  (the alpha network)
+        self.index = {}
+        for rule_idx, rules in enumerate(symbolic.rules.values()):
+            for prop, expected in rules.items():
+                self.index.setdefault(prop, {}).setdefault(expected, []).append(rule_idx)
+        self.shapes = {}
+        self.listeners = []
+
+    def subscribe(self, callback):
+        """Call callback(event) for every ClassificationChanged"""
+        self.listeners.append(callback)
+
+    def classification(self, shape_id):
+        state = self.shapes.get(shape_id)
+        if state is None:
+            return "unknown", 0
+        return state.label, state.confidence
+
+    def update(self, shape_id, prop, value):
+        """Set one property (None removes it); returns the event or None"""
+        state = self.shapes.get(shape_id)
+        if state is None:
+            state = self.shapes[shape_id] = _ShapeState(len(self.shape_names))
+        old = state.values.get(prop)
+        if value is None:
+            state.values.pop(prop, None)
+        else:
+            state.values[prop] = value
+        if old == value:
+            return None
+
+        by_value = self.index.get(prop)
+        if by_value:
+            if old is not None:
+                for rule_idx in by_value.get(old, ()):
+                    self._adjust(state, rule_idx, -1)
+            if value is not None:
+                for rule_idx in by_value.get(value, ()):
+                    self._adjust(state, rule_idx, +1)
+        return self._refresh(shape_id, state)
+
+    def update_many(self, shape_id, properties):
+        """Apply several property updates, return the resulting events"""
+        events = [self.update(shape_id, prop, value) for prop, value in properties.items()]
+        return [event for event in events if event is not None]
+
+    def apply(self, stream):
+        """Consume (shape_id, property, value) updates, yield change events"""
+        for shape_id, prop, value in stream:
+            event = self.update(shape_id, prop, value)
+            if event is not None:
+                yield event
+
+    def remove(self, shape_id):
+        self.shapes.pop(shape_id, None)
+
+    def _adjust(self, state, rule_idx, delta):
+        was_passing = self._passes(state.matches[rule_idx], rule_idx)
+        state.matches[rule_idx] += delta
+        now_passing = self._passes(state.matches[rule_idx], rule_idx)
+        if now_passing and not was_passing:
+            bisect.insort(state.passing, rule_idx)
+        elif was_passing and not now_passing:
+            del state.passing[bisect.bisect_left(state.passing, rule_idx)]
+
+    def _passes(self, matches, rule_idx):
+        return (matches / self.rule_sizes[rule_idx]) * 100 >= self.threshold
+
+    def _refresh(self, shape_id, state):
+        if state.passing:
+            winner = state.passing[0]
+            label = self.shape_names[winner]
+            confidence = (state.matches[winner] / self.rule_sizes[winner]) * 100
+        else:
+            label, confidence = "unknown", 0
+        if label == state.label and confidence == state.confidence:
+            return None
+        event = ClassificationChanged(shape_id, state.label, state.confidence, label, confidence)
+        state.label, state.confidence = label, confidence
+        for callback in self.listeners:
+            callback(event)
+        return event
+
+
+if __name__ == "__main__":
+    # Example usage: properties of one shape arrive one at a time
+    matcher = IncrementalMatcher()
+    matcher.subscribe(lambda e: print(f"  {e.shape_id}: {e.old_label} -> "
+                                      f"{e.new_label} ({e.new_confidence:.1f}%)"))
+    stream = [
+        ('shape-1', 'corners', 4),
+        ('shape-1', 'equal_sides', True),
+        ('shape-1', 'angles', 90),
+        ('shape-2', 'corners', 3),
+        ('shape-2', 'angles_sum', 180),
+        ('shape-1', 'corners', 3),
+        ('shape-1', 'equal_sides', None),
+    ]
+    for shape_id, prop, value in stream:
+        print(f"{shape_id}.{prop} = {value}")
+        matcher.update(shape_id, prop, value)
+    print(matcher.classification('shape-1'), matcher.classification('shape-2'))
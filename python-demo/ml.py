@@ -1,19 +1,37 @@
-import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 import joblib
 
-# Reading the weather dataset
+import argparse
+
+from dataset_cache import load_csv_cached
+from weather_sampling import sample_csv
+
+# Optional sampling for quick tuning runs: python ml.py --sample 5000 --stratify season
+parser = argparse.ArgumentParser(description="Next-day temperature regression")
+parser.add_argument('--sample', type=int, default=0, help="rows to sample (0 = use all rows)")
+parser.add_argument('--stratify', choices=['month', 'season'], help="stratify the sample")
+parser.add_argument('--seed', type=int, default=0, help="sampling seed")
+args = parser.parse_args()
+
+# Reading the weather dataset (parsed once, then served from a columnar cache)
 print("Ensure 'weather_prediction_dataset.csv' is in the current directory.")
-df = pd.read_csv('weather_prediction_dataset.csv')
+columns = ['DATE', 'TOURS_temp_mean', 'TOURS_humidity', 'TOURS_pressure', 'TOURS_wind_speed']
+if args.sample:
+    # Each sampled unit is a day plus the day after it, so the target stays "next day"
+    df = sample_csv('weather_prediction_dataset.csv', args.sample, stratify=args.stratify,
+                    window=2, columns=columns, seed=args.seed)
+else:
+    df = load_csv_cached('weather_prediction_dataset.csv', columns=columns)
+    df['_window'] = 0
 
 # Simple preprocessing: drop NA, sort by date and location
 df = df.dropna(subset=['TOURS_temp_mean', 'TOURS_humidity', 'TOURS_pressure', 'TOURS_wind_speed'])
 df = df.sort_values(['DATE'])
 
 print(df.head())
-# Shift 'mean_temp' for next day prediction, group by location
-df['next_day_temp'] = df['TOURS_temp_mean'].shift(-1)
+# Shift 'mean_temp' for next day prediction, within each sampled window
+df['next_day_temp'] = df.groupby('_window')['TOURS_temp_mean'].shift(-1)
 df = df.dropna(subset=['next_day_temp'])
 
 # Feature & target selection
@@ -0,0 +1,289 @@
+# BOTTOM-UP APPROACH (Connectionist AI) - Neural network shared by the batch tools
+import numpy as np
+
+import profiling
+
+SHAPE_CLASSES = ['square', 'circle', 'triangle', 'rectangle']
+
+
+def default_classes(n):
+    """Shape names for the first n outputs, generic names beyond those"""
+    return SHAPE_CLASSES[:n] + [f"class_{i}" for i in range(len(SHAPE_CLASSES), n)]
+
+
+def softmax(logits):
+    """Numerically stable softmax over the last axis"""
+    shifted = logits - np.max(logits, axis=-1, keepdims=True)
+    exps = np.exp(shifted)
+    return exps / exps.sum(axis=-1, keepdims=True)
+
+
+class NeuralNetwork:
+    def __init__(self, input_size=8, hidden_size=5, output_size=3):
+        # Initialize random weights (normally learned from training data)
+        # Defaults are the 8-5-3 network demoed by bottom-up-ai.py; ai-comparison.py uses (4, 3, 3)
+        np.random.seed(42)
+        self.weights_input_hidden = np.random.randn(input_size, hidden_size) * 0.5
+        self.weights_hidden_output = np.random.randn(hidden_size, output_size) * 0.5
+        self.bias_hidden = np.random.randn(hidden_size) * 0.1
+        self.bias_output = np.random.randn(output_size) * 0.1
+        self.classes = default_classes(output_size)
+        # Softmax temperature, see fit_temperature()
+        self.temperature = 1.0
+
+    def sigmoid(self, x):
+        """Activation function"""
+        return 1 / (1 + np.exp(-np.clip(x, -500, 500)))
+
+    def forward(self, features):
+        """Forward propagation through network (one vector or an (N, 8) batch)"""
+        output_input, hidden_output = self.logits(features, return_hidden=True)
+        with profiling.stage('nn.output_sigmoid'):
+            output = self.sigmoid(output_input)
+        return output, hidden_output
+
+    def logits(self, features, return_hidden=False):
+        """Output layer pre-activations, (N, classes) for a batch"""
+        if profiling.ENABLED:
+            output_input, hidden_output = self._logits_profiled(features)
+        else:
+            hidden_output = self.sigmoid(np.dot(features, self.weights_input_hidden) + self.bias_hidden)
+            output_input = np.dot(hidden_output, self.weights_hidden_output) + self.bias_output
+        return (output_input, hidden_output) if return_hidden else output_input
+
+    def _logits_profiled(self, features):
+        with profiling.stage('nn.input_hidden_matmul'):
+            hidden_input = np.dot(features, self.weights_input_hidden) + self.bias_hidden
+        with profiling.stage('nn.hidden_sigmoid'):
+            hidden_output = self.sigmoid(hidden_input)
+        with profiling.stage('nn.hidden_output_matmul'):
+            output_input = np.dot(hidden_output, self.weights_hidden_output) + self.bias_output
+        return output_input, hidden_output
+
+    def predict_proba(self, features):
+        """Softmax class probabilities as float32, (N, classes) even for one vector"""
+        logits = self.logits(np.atleast_2d(features))
+        return softmax(logits / self.temperature).astype(np.float32)
+
+    def fit_temperature(self, features, labels, low=0.05, high=20.0, iterations=60):
+        """Fit self.temperature on held-out data by minimizing negative log-likelihood"""
+        logits = np.atleast_2d(self.logits(features))
+        labels = np.asarray(labels)
+        true_logits = logits[np.arange(len(labels)), labels]
+
+        def nll(log_t):
+            scaled = logits / np.exp(log_t)
+            peak = scaled.max(axis=1)
+            log_norm = peak + np.log(np.exp(scaled - peak[:, None]).sum(axis=1))
+            return np.mean(log_norm - true_logits / np.exp(log_t))
+
+        # Golden-section search over log(T); NLL is unimodal in T
+        ratio = (np.sqrt(5) - 1) / 2
+        a, b = np.log(low), np.log(high)
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        for _ in range(iterations):
+            if nll(c) < nll(d):
+                b, d = d, c
+                c = b - ratio * (b - a)
+            else:
+                a, c = c, d
+                d = a + ratio * (b - a)
+        self.temperature = float(np.exp((a + b) / 2))
+        return self.temperature
+
+    def classify(self, features):
+        """Neural network classification (black box)"""
+        output_input = self.logits(features)
+
+        # Highest activation wins; confidence is its softmax probability
+        with profiling.stage('nn.softmax'):
+            probabilities = softmax(output_input / self.temperature)
+        with profiling.stage('nn.argmax'):
+            prediction_idx = np.argmax(probabilities)
+        confidence = float(probabilities[prediction_idx]) * 100
+
+        return self.classes[prediction_idx], confidence
+
+
+# In-place activations: each overwrites its (..., width) argument
+def _sigmoid_(x):
+    # Largest |x| whose exp() still fits the dtype: 88 for float32, 709 for float64
+    bound = np.floor(np.log(np.finfo(x.dtype).max))
+    np.clip(x, -bound, bound, out=x)
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    np.reciprocal(x, out=x)
+
+
+def _relu_(x):
+    np.maximum(x, 0, out=x)
+
+
+def _tanh_(x):
+    np.tanh(x, out=x)
+
+
+def _softmax_(x):
+    x -= x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'sigmoid': _sigmoid_,
+    'relu': _relu_,
+    'tanh': _tanh_,
+    'softmax': _softmax_,
+}
+
+
+class DeepNetwork:
+    """Arbitrary stack of dense layers evaluated batch-at-a-time
+
+    Intermediate activations are written into two reusable ping-pong
+    buffers, so a forward pass allocates only its returned output.
+    Not safe to share one instance between threads.
+    """
+
+    def __init__(self, layer_sizes, activation='sigmoid', output_activation='softmax',
+                 classes=None, seed=42, dtype=np.float32):
+        if len(layer_sizes) < 2:
+            raise ValueError("layer_sizes needs at least an input and an output size")
+        rng = np.random.RandomState(seed)
+        self.dtype = np.dtype(dtype)
+        self.layers = []
+        for i, (fan_in, fan_out) in enumerate(zip(layer_sizes[:-1], layer_sizes[1:])):
+            weights = (rng.randn(fan_in, fan_out) * np.sqrt(1.0 / fan_in)).astype(self.dtype)
+            bias = (rng.randn(fan_out) * 0.1).astype(self.dtype)
+            is_output = i == len(layer_sizes) - 2
+            self.add_layer(weights, bias, output_activation if is_output else activation)
+        self.classes = classes or default_classes(layer_sizes[-1])
+
+    @classmethod
+    def from_layers(cls, layers, classes=None):
+        """Build from explicit [(weights, bias, activation), ...]"""
+        network = cls.__new__(cls)
+        network.dtype = np.result_type(*[w for w, _, _ in layers])
+        network.layers = []
+        for weights, bias, activation in layers:
+            network.add_layer(weights, bias, activation)
+        network.classes = classes or default_classes(network.output_size)
+        return network
+
+    @classmethod
+    def from_network(cls, network):
+        """Wrap a single-hidden-layer NeuralNetwork with identical outputs"""
+        return cls.from_layers([
+            (network.weights_input_hidden, network.bias_hidden, 'sigmoid'),
+            (network.weights_hidden_output, network.bias_output, 'sigmoid'),
+        ], classes=list(network.classes))
+
+    def add_layer(self, weights, bias, activation):
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"activation must be one of {sorted(ACTIVATIONS)}, got {activation!r}")
+        weights = np.ascontiguousarray(weights, dtype=self.dtype)
+        bias = np.ascontiguousarray(bias, dtype=self.dtype)
+        if self.layers and weights.shape[0] != self.layers[-1][0].shape[1]:
+            raise ValueError(f"layer input size {weights.shape[0]} does not match "
+                             f"previous output size {self.layers[-1][0].shape[1]}")
+        if bias.shape != (weights.shape[1],):
+            raise ValueError(f"bias shape {bias.shape} does not match weights {weights.shape}")
+        self.layers.append((weights, bias, activation))
+        self._buffers = None
+
+    @property
+    def input_size(self):
+        return self.layers[0][0].shape[0]
+
+    @property
+    def output_size(self):
+        return self.layers[-1][0].shape[1]
+
+    def _ping_pong(self, n):
+        """Two flat scratch buffers big enough for the widest layer at batch n"""
+        width = max(weights.shape[1] for weights, _, _ in self.layers)
+        if self._buffers is None or self._buffers[0].size < n * width:
+            self._buffers = (np.empty(n * width, dtype=self.dtype),
+                             np.empty(n * width, dtype=self.dtype))
+        return self._buffers
+
+    def forward(self, features):
+        """(N, input_size) -> (N, output_size); a single vector gives one row"""
+        x = np.asarray(features, dtype=self.dtype)
+        single = x.ndim == 1
+        x = np.atleast_2d(x)
+        n = x.shape[0]
+        buffers = self._ping_pong(n)
+        for i, (weights, bias, activation) in enumerate(self.layers):
+            out = buffers[i % 2][:n * weights.shape[1]].reshape(n, weights.shape[1])
+            np.matmul(x, weights, out=out)
+            out += bias
+            ACTIVATIONS[activation](out)
+            x = out
+        output = x.copy()
+        return output[0] if single else output
+
+    def predict(self, features):
+        """Class index per row"""
+        return np.argmax(self.forward(np.atleast_2d(features)), axis=1)
+
+    def classify(self, features):
+        output = self.forward(features)
+        prediction_idx = np.argmax(output)
+        return self.classes[prediction_idx], float(output[prediction_idx]) * 100
+
+
+def benchmark_deep_network(widths=(8, 32, 128, 512, 1024), depths=(1, 2, 4, 8),
+                           batch_size=4096, repeats=5):
+    """Samples/sec of DeepNetwork.forward for each (hidden width, hidden depth)"""
+    import time
+
+    results = {}
+    for width in widths:
+        features = np.random.rand(batch_size, width).astype(np.float32)
+        for depth in depths:
+            network = DeepNetwork([width] + [width] * depth + [3], activation='relu')
+            network.forward(features)  # warm up buffers
+            start = time.perf_counter()
+            for _ in range(repeats):
+                network.forward(features)
+            elapsed = (time.perf_counter() - start) / repeats
+            results[(width, depth)] = batch_size / elapsed
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage (run with AI_DEMO_PROFILE=1 to collect stage timings)
+    nn = NeuralNetwork()
+    test_features = np.array([0.8, 0.1, 0.7, 0.9, 0.5, 0.2, 0.4, 0.6])
+    result, confidence = nn.classify(test_features)
+    print(f"Prediction: {result} ({confidence:.1f}% confidence)")
+
+    for _ in range(1000):
+        nn.classify(test_features)
+    if profiling.ENABLED:
+        print(profiling.export_json())
+
+    # Calibrated probabilities for a batch (temperature fitted on held-out rows)
+    rng = np.random.RandomState(0)
+    held_out = rng.rand(500, 8)
+    # Stand-in labels: the network's own predictions with 20% label noise
+    held_out_labels = nn.predict_proba(held_out).argmax(axis=1)
+    noisy = rng.rand(len(held_out)) < 0.2
+    held_out_labels[noisy] = rng.randint(0, 3, noisy.sum())
+    print(f"Fitted temperature: {nn.fit_temperature(held_out, held_out_labels):.3f}")
+    print(nn.predict_proba(held_out[:3]))
+
+    # Same network as a layer stack, then a deeper one
+    deep = DeepNetwork.from_network(nn)
+    print(f"Layer stack: {deep.classify(test_features)}")
+    deep = DeepNetwork([8, 64, 64, 3], activation='relu')
+    print(f"Deep network: {deep.classify(test_features)}")
+
+    print("\nForward throughput (samples/sec), rows=width, cols=depth:")
+    results = benchmark_deep_network()
+    depths = sorted({d for _, d in results})
+    print("width " + "".join(f"{d:>12}" for d in depths))
+    for width in sorted({w for w, _ in results}):
+        print(f"{width:>5} " + "".join(f"{results[(width, d)]:>12,.0f}" for d in depths))
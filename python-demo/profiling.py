@@ -0,0 +1,162 @@
+# PROFILING HOOKS - Per-stage timing histograms for the classify and forward paths
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+# Off unless AI_DEMO_PROFILE=1 is set; callers check profiling.ENABLED
+ENABLED = os.environ.get('AI_DEMO_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+
+# Upper bounds in seconds (Prometheus-style, +Inf is implicit)
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+
+class Histogram:
+    """Duration histogram with call count and total time for one stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'buckets': dict(zip([str(b) for b in BUCKETS] + ['+Inf'], self.bucket_counts)),
+        }
+
+
+_histograms = {}
+_registry_lock = threading.Lock()
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def get_histogram(name):
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _registry_lock:
+            histogram = _histograms.setdefault(name, Histogram(name))
+    return histogram
+
+
+def reset():
+    with _registry_lock:
+        _histograms.clear()
+
+
+class _NullStage:
+    """Shared no-op context manager returned while profiling is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _TimedStage:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        get_histogram(self.name).observe(time.perf_counter() - self.start)
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Time the enclosed `with` block into the histogram for `name`"""
+    if not ENABLED:
+        return _NULL_STAGE
+    return _TimedStage(name)
+
+
+def timed(name):
+    """Decorator version of stage()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_histogram(name).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def export_json(indent=2):
+    return json.dumps({name: h.to_dict() for name, h in sorted(_histograms.items())},
+                      indent=indent)
+
+
+def export_prometheus(metric='ai_demo_stage_seconds'):
+    """Render all histograms in the Prometheus text exposition format"""
+    lines = [f"# HELP {metric} Duration of instrumented classify/forward stages.",
+             f"# TYPE {metric} histogram"]
+    for name, h in sorted(_histograms.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(list(BUCKETS) + ['+Inf'], h.bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_sum{{stage="{name}"}} {h.total}')
+        lines.append(f'{metric}_count{{stage="{name}"}} {h.count}')
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port=9108, host='127.0.0.1'):
+    """Serve /metrics (Prometheus) and /metrics.json from a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = export_prometheus(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = export_json(), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
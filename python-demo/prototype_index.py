@@ -0,0 +1,309 @@
+# NEAREST-PROTOTYPE INDEX - Third approach: classify by the closest labeled feature vectors
+import time
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+    HAVE_SCIPY = True
+except ImportError:
+    HAVE_SCIPY = False
+
+# Canonical feature prototypes from approach-working-demo/script.py. These are
+# illustrative values, not measurements: for vectors from shape_features.extract_features
+# build the index from shape_features.reference_prototypes() instead
+CANONICAL_PROTOTYPES = {
+    'circle': [0.1, 0.9, 0.2, 0.1, 0.8, 0.9, 0.1, 0.2],
+    'square': [0.9, 0.1, 0.9, 0.9, 0.2, 0.1, 0.9, 0.8],
+    'triangle': [0.7, 0.2, 0.7, 0.6, 0.3, 0.2, 0.7, 0.5],
+    'rectangle': [0.8, 0.1, 0.8, 0.6, 0.2, 0.1, 0.8, 0.4],
+}
+
+
+def _top_k(d2, k):
+    """Row-wise k smallest of a (Q, M) distance matrix -> (distances, columns), sorted"""
+    k = min(k, d2.shape[1])
+    if k < d2.shape[1]:
+        cols = np.argpartition(d2, k - 1, axis=1)[:, :k]
+    else:
+        cols = np.broadcast_to(np.arange(k), d2.shape).copy()
+    vals = np.take_along_axis(d2, cols, axis=1)
+    order = np.argsort(vals, axis=1, kind='stable')
+    return np.take_along_axis(vals, order, axis=1), np.take_along_axis(cols, order, axis=1)
+
+
+class KDTree:
+    """Minimal KD-tree over a fixed point set (used when SciPy is not installed)
+
+    Points are reordered so every leaf is a contiguous slice; leaves are
+    scanned with NumPy, the descent itself is plain Python.
+    """
+
+    def __init__(self, points, leaf_size=32):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(self.points))
+        # Node arrays: split dimension (-1 for leaves), split value, children, point range
+        self.split_dim, self.split_val = [], []
+        self.left, self.right, self.start, self.end = [], [], [], []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self.data = self.points[self.order]
+
+    def _new_node(self, start, end):
+        for column in (self.split_dim, self.left, self.right):
+            column.append(-1)
+        self.split_val.append(0.0)
+        self.start.append(start)
+        self.end.append(end)
+        return len(self.start) - 1
+
+    def _build(self, start, end):
+        node = self._new_node(start, end)
+        if end - start <= self.leaf_size:
+            return node
+        block = self.points[self.order[start:end]]
+        dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+        mid = (end - start) // 2
+        part = np.argpartition(block[:, dim], mid)
+        self.order[start:end] = self.order[start:end][part]
+        self.split_dim[node] = dim
+        self.split_val[node] = float(self.points[self.order[start + mid], dim])
+        self.left[node] = self._build(start, start + mid)
+        self.right[node] = self._build(start + mid, end)
+        return node
+
+    def _query_one(self, q, k):
+        best_d2 = np.full(0, np.inf)
+        best_idx = np.full(0, -1, dtype=np.intp)
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best_d2) == k and bound >= best_d2[-1]:
+                continue
+            dim = self.split_dim[node]
+            if dim < 0:
+                start, end = self.start[node], self.end[node]
+                d2 = ((self.data[start:end] - q) ** 2).sum(axis=1)
+                best_d2 = np.concatenate((best_d2, d2))
+                best_idx = np.concatenate((best_idx, np.arange(start, end)))
+                keep = np.argsort(best_d2, kind='stable')[:k]
+                best_d2, best_idx = best_d2[keep], best_idx[keep]
+                continue
+            diff = q[dim] - self.split_val[node]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+        return best_d2, self.order[best_idx]
+
+    def query(self, queries, k=1):
+        """(Q, dim) -> (Q, k) distances and point indices, nearest first"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        k = min(k, len(self.points))
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        for i, q in enumerate(queries):
+            d2, idx = self._query_one(q, k)
+            distances[i], indices[i] = np.sqrt(d2), idx
+        return distances, indices
+
+
+class PrototypeIndex:
+    """Labeled prototype vectors with batched brute-force and KD-tree top-k search
+
+    Inserts append to a growable buffer. The tree covers a prefix of the
+    points and is rebuilt lazily once the unindexed tail exceeds
+    `rebuild_fraction` of it; the tail is always searched by brute force.
+    """
+
+    def __init__(self, dim=8, leaf_size=32, rebuild_fraction=0.1, tree_max_dim=None):
+        self.dim = dim
+        self.leaf_size = leaf_size
+        self.rebuild_fraction = rebuild_fraction
+        # 'auto' queries use the tree up to this dimension; the pure-Python
+        # fallback tree only beats batched BLAS in very low dimensions
+        self.tree_max_dim = tree_max_dim if tree_max_dim is not None else (16 if HAVE_SCIPY else 4)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.sq_norms = np.empty(0, dtype=np.float32)
+        self.labels = np.empty(0, dtype=np.int32)
+        self.label_names = []
+        self.size = 0
+        self._tree = None
+        self._tree_size = 0
+
+    @classmethod
+    def from_prototypes(cls, prototypes=CANONICAL_PROTOTYPES, **kwargs):
+        index = cls(dim=len(next(iter(prototypes.values()))), **kwargs)
+        index.add(list(prototypes.values()), list(prototypes))
+        return index
+
+    def __len__(self):
+        return self.size
+
+    def add(self, vectors, labels):
+        """Insert (M, dim) vectors with their label names"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+        if len(labels) != len(vectors):
+            raise ValueError(f"{len(vectors)} vectors but {len(labels)} labels")
+        label_ids = {name: i for i, name in enumerate(self.label_names)}
+        codes = np.empty(len(labels), dtype=np.int32)
+        for i, name in enumerate(labels):
+            if name not in label_ids:
+                label_ids[name] = len(self.label_names)
+                self.label_names.append(name)
+            codes[i] = label_ids[name]
+
+        # Grow by doubling so repeated small inserts stay amortized O(1)
+        needed = self.size + len(vectors)
+        if needed > len(self.vectors):
+            capacity = max(needed, 2 * len(self.vectors), 1024)
+            for name in ('vectors', 'sq_norms', 'labels'):
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:self.size] = old[:self.size]
+                setattr(self, name, grown)
+        self.vectors[self.size:needed] = vectors
+        self.sq_norms[self.size:needed] = np.einsum('ij,ij->i', vectors, vectors)
+        self.labels[self.size:needed] = codes
+        self.size = needed
+
+    def _brute(self, queries, start, end, k, chunk_elements=1 << 24):
+        """|q|^2 - 2 q.p + |p|^2 with one BLAS matmul per chunk of queries"""
+        points = self.vectors[start:end]
+        norms = self.sq_norms[start:end]
+        # Bound the (chunk, points) distance block to chunk_elements floats
+        chunk_rows = max(1, chunk_elements // max(len(points), 1))
+        distances, indices = [], []
+        for i in range(0, len(queries), chunk_rows):
+            q = queries[i:i + chunk_rows]
+            d2 = np.einsum('ij,ij->i', q, q)[:, None] - 2 * (q @ points.T) + norms
+            np.maximum(d2, 0, out=d2)
+            d, idx = _top_k(d2, k)
+            distances.append(d)
+            indices.append(idx + start)
+        return np.vstack(distances), np.vstack(indices)
+
+    def _ensure_tree(self):
+        tail = self.size - self._tree_size
+        if self._tree is None or tail > self.rebuild_fraction * self._tree_size:
+            points = self.vectors[:self.size]
+            self._tree = (cKDTree(points, leafsize=self.leaf_size) if HAVE_SCIPY
+                          else KDTree(points, leaf_size=self.leaf_size))
+            self._tree_size = self.size
+        return self._tree
+
+    def query(self, queries, k=1, method='auto'):
+        """(Q, dim) -> (Q, k) euclidean distances and prototype indices, nearest first"""
+        if self.size == 0:
+            raise LookupError("the index is empty")
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, self.size)
+        if method == 'auto':
+            method = 'tree' if self.dim <= self.tree_max_dim and self.size > 4 * self.leaf_size else 'brute'
+        if method == 'brute':
+            d2, indices = self._brute(queries, 0, self.size, k)
+            return np.sqrt(d2), indices
+        if method != 'tree':
+            raise ValueError(f"method must be 'auto', 'brute' or 'tree', got {method!r}")
+
+        tree = self._ensure_tree()
+        distances, indices = tree.query(queries, k=k)
+        distances = np.asarray(distances, dtype=np.float64).reshape(len(queries), -1)
+        indices = np.asarray(indices, dtype=np.intp).reshape(len(queries), -1)
+        if self._tree_size < self.size:
+            # Merge in the points inserted since the last rebuild
+            tail_d2, tail_idx = self._brute(queries, self._tree_size, self.size, k)
+            all_d = np.hstack((distances, np.sqrt(tail_d2)))
+            all_idx = np.hstack((indices, tail_idx))
+            distances, cols = _top_k(all_d, k)
+            indices = np.take_along_axis(all_idx, cols, axis=1)
+        return distances, indices
+
+    def classify(self, features, k=1, method='auto'):
+        """Majority label of the k nearest prototypes -> (names, confidences %)"""
+        _, indices = self.query(features, k, method)
+        votes = self.labels[indices]
+        counts = (votes[..., None] == np.arange(len(self.label_names))).sum(axis=1)
+        winners = counts.argmax(axis=1)
+        names = np.array(self.label_names, dtype=object)[winners]
+        return names, counts.max(axis=1) / indices.shape[1] * 100
+
+    def save(self, path):
+        """Write vectors, labels and label names to a .npz file (tree is rebuilt on use)"""
+        np.savez(path, vectors=self.vectors[:self.size], labels=self.labels[:self.size],
+                 label_names=np.array(self.label_names, dtype=str))
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with np.load(path, allow_pickle=False) as data:
+            index = cls(dim=data['vectors'].shape[1], **kwargs)
+            names = data['label_names'].tolist()
+            index.add(data['vectors'], [names[i] for i in data['labels']])
+        return index
+
+
+def benchmark_index(n=200_000, queries=2_000, k=5, dim=8, seed=0):
+    """Per-query latency (microseconds) for linear scan, batched BLAS and KD-tree"""
+    rng = np.random.RandomState(seed)
+    if dim == 8:
+        centers = np.array(list(CANONICAL_PROTOTYPES.values()))
+        names = list(CANONICAL_PROTOTYPES)
+    else:
+        centers = rng.rand(4, dim)
+        names = [f"shape_{i}" for i in range(4)]
+    labels = rng.randint(0, len(names), n)
+    index = PrototypeIndex(dim=dim)
+    index.add(centers[labels] + rng.normal(0, 0.05, (n, dim)), [names[i] for i in labels])
+    q = centers[rng.randint(0, len(names), queries)] + rng.normal(0, 0.05, (queries, dim))
+    q = q.astype(np.float32)
+    vectors = index.vectors[:index.size]
+
+    def per_query(func, count):
+        start = time.perf_counter()
+        func()
+        return (time.perf_counter() - start) / count * 1e6
+
+    scan_count = min(queries, 200)
+    results = {
+        'linear scan': per_query(lambda: [np.argsort(((vectors - row) ** 2).sum(axis=1))[:k]
+                                          for row in q[:scan_count]], scan_count),
+        'batched BLAS': per_query(lambda: index.query(q, k, method='brute'), queries),
+    }
+    index.query(q[:1], k, method='tree')  # build outside the timed region
+    tree_count = queries if HAVE_SCIPY else min(queries, 200)
+    results['KD-tree'] = per_query(lambda: index.query(q[:tree_count], k, method='tree'), tree_count)
+    return results
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    # Example usage: canonical prototypes, then a few incremental inserts
+    index = PrototypeIndex.from_prototypes()
+    index.add([[0.85, 0.1, 0.85, 0.75, 0.2, 0.1, 0.85, 0.6]], ['rectangle'])
+    features = np.array([[0.9, 0.1, 0.9, 0.9, 0.2, 0.1, 0.9, 0.8],
+                         [0.2, 0.8, 0.2, 0.1, 0.8, 0.8, 0.1, 0.2]])
+    names, confidences = index.classify(features, k=1)
+    for name, confidence in zip(names, confidences):
+        print(f"Prediction: {name} ({confidence:.1f}% confidence)")
+
+    # Extracted features live on their own scale, so index measured references
+    from shape_features import extract_features, reference_polygons, reference_prototypes, to_ragged
+
+    measured = PrototypeIndex.from_prototypes(reference_prototypes())
+    polygons = reference_polygons()
+    names, _ = measured.classify(extract_features(*to_ragged(list(polygons.values()))), k=1)
+    print(f"Extracted {list(polygons)} -> {list(names)}")
+
+    path = os.path.join(tempfile.mkdtemp(), 'prototypes.npz')
+    index.save(path)
+    print(f"Reloaded {len(PrototypeIndex.load(path))} prototypes from {path}")
+
+    backend = 'scipy' if HAVE_SCIPY else 'built-in'
+    for dim in (3, 8):
+        print(f"\nQuery latency, {dim}-D, 200,000 prototypes (KD-tree backend: {backend}):")
+        for name, micros in benchmark_index(dim=dim).items():
+            print(f"  {name:<13} {micros:10.1f} us")
@@ -0,0 +1,282 @@
+# FEATURE EXTRACTION - 8-element shape feature vectors from raw polygon outlines
+import numpy as np
+
+from shape_records import MISSING, SYMMETRY_TYPES, ShapeRecordArray
+
+# Same names and order as the input layer described in approach-working-demo/script.py.
+# The values are measured, so they are not on the scale of that file's hand-picked
+# example vectors (prototype_index.CANONICAL_PROTOTYPES); see reference_prototypes()
+FEATURE_NAMES = ('corner_count', 'curve_presence', 'side_count', 'side_equality',
+                 'angle_measure', 'symmetry_type', 'area_ratio', 'perimeter_ratio')
+
+# Corner and side counts are scaled by this and clipped to 1.0
+MAX_CORNERS = 8
+
+
+def to_ragged(polygons):
+    """List of (V_i, 2) vertex arrays -> flat (sum V_i, 2) vertices and (N+1,) offsets"""
+    counts = np.array([len(p) for p in polygons], dtype=np.intp)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    vertices = np.concatenate([np.asarray(p, dtype=float) for p in polygons])
+    return vertices, offsets
+
+
+def padded_to_ragged(vertices, counts):
+    """Padded (N, V, 2) vertices with per-polygon counts -> flat vertices and offsets"""
+    vertices = np.asarray(vertices, dtype=float)
+    counts = np.asarray(counts, dtype=np.intp)
+    mask = np.arange(vertices.shape[1]) < counts[:, None]
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    return vertices[mask], offsets
+
+
+def _drop_repeated_vertices(vertices, offsets):
+    """Remove vertices equal to the next one in their polygon, including a closing repeat
+
+    Zero-length edges would otherwise turn a closed ring into a polygon
+    with an extra, meaningless turn at the repeated point.
+    """
+    counts = np.diff(offsets)
+    if not len(vertices):
+        return vertices, offsets
+    poly_id = np.repeat(np.arange(len(counts)), counts)
+    idx = np.arange(len(vertices))
+    nxt = np.where(idx == offsets[poly_id + 1] - 1, offsets[poly_id], idx + 1)
+    keep = np.any(vertices != vertices[nxt], axis=1)
+    if keep.all():
+        return vertices, offsets
+    counts = np.bincount(poly_id[keep], minlength=len(counts))
+    return vertices[keep], np.concatenate(([0], np.cumsum(counts)))
+
+
+def _geometry(vertices, offsets, corner_threshold=20.0, min_side_fraction=0.02):
+    """Per-polygon geometric measurements for a ragged batch"""
+    vertices = np.asarray(vertices, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    vertices, offsets = _drop_repeated_vertices(vertices, offsets)
+    counts = np.diff(offsets)
+    if np.any(counts < 3):
+        raise ValueError("every polygon needs at least 3 distinct vertices")
+    n = len(counts)
+    starts = offsets[:-1]
+    poly_id = np.repeat(np.arange(n), counts)
+
+    # Neighbour indices that wrap around inside each polygon
+    idx = np.arange(len(vertices))
+    first = offsets[poly_id]
+    last = offsets[poly_id + 1] - 1
+    nxt = np.where(idx == last, first, idx + 1)
+    prv = np.where(idx == first, last, idx - 1)
+
+    # Work relative to each polygon's first vertex to keep moments well conditioned
+    local = vertices - vertices[first]
+    x, y = local[:, 0], local[:, 1]
+    xn, yn = x[nxt], y[nxt]
+
+    # Shoelace area, centroid and second moments of area
+    cross = x * yn - xn * y
+    signed_area = 0.5 * np.add.reduceat(cross, starts)
+    area = np.abs(signed_area)
+    safe_area = np.where(signed_area == 0, 1.0, signed_area)
+    cx = np.add.reduceat((x + xn) * cross, starts) / (6 * safe_area)
+    cy = np.add.reduceat((y + yn) * cross, starts) / (6 * safe_area)
+    ixx = np.add.reduceat((y * y + y * yn + yn * yn) * cross, starts) / 12 - signed_area * cy ** 2
+    iyy = np.add.reduceat((x * x + x * xn + xn * xn) * cross, starts) / 12 - signed_area * cx ** 2
+    ixy = (np.add.reduceat((x * yn + 2 * x * y + 2 * xn * yn + xn * y) * cross, starts) / 24
+           - signed_area * cx * cy)
+    half_trace = (ixx + iyy) / 2
+    spread = np.sqrt(((ixx - iyy) / 2) ** 2 + ixy ** 2)
+    big, small = np.abs(half_trace + spread), np.abs(half_trace - spread)
+    isotropy = np.divide(np.minimum(big, small), np.maximum(big, small),
+                         out=np.zeros(n), where=np.maximum(big, small) > 0)
+
+    # Edge lengths and perimeter
+    edge_lengths = np.hypot(xn - x, yn - y)
+    perimeter = np.add.reduceat(edge_lengths, starts)
+    # Collinear outlines have no interior; relative tolerance absorbs rounding
+    flat = np.flatnonzero(area <= 1e-12 * perimeter ** 2)
+    if len(flat):
+        raise ValueError(f"polygon {flat[0]} has zero area (collinear vertices)")
+    dist_before = np.cumsum(edge_lengths) - edge_lengths
+
+    # Signed turning angle at every vertex; interior angle follows from orientation
+    ax, ay = x - x[prv], y - y[prv]
+    bx, by = xn - x, yn - y
+    turn = np.degrees(np.arctan2(ax * by - ay * bx, ax * bx + ay * by))
+    orientation = np.where(signed_area[poly_id] >= 0, 1.0, -1.0)
+    interior = 180.0 - turn * orientation
+    abs_turn = np.abs(turn)
+    is_corner = abs_turn >= corner_threshold
+
+    # Curvature share: how much of the total turning happens away from corners
+    total_turn = np.add.reduceat(abs_turn, starts)
+    smooth_turn = np.add.reduceat(np.where(is_corner, 0.0, abs_turn), starts)
+    curve_presence = np.divide(smooth_turn, total_turn, out=np.zeros(n), where=total_turn > 0)
+
+    # Corner statistics
+    corners = np.flatnonzero(is_corner)
+    corner_poly = poly_id[corners]
+    corner_count = np.bincount(corner_poly, minlength=n)
+    has_corners = corner_count > 0
+    angle_sum = np.bincount(corner_poly, weights=interior[corners], minlength=n)
+    angle_sq = np.bincount(corner_poly, weights=interior[corners] ** 2, minlength=n)
+    safe_corners = np.maximum(corner_count, 1)
+    angle_mean = np.where(has_corners, angle_sum / safe_corners, 180.0)
+    angle_std = np.sqrt(np.maximum(angle_sq / safe_corners - (angle_sum / safe_corners) ** 2, 0))
+
+    # Sides run from one corner to the next (wrapping within the polygon)
+    group_start = np.concatenate(([True], corner_poly[1:] != corner_poly[:-1]))
+    group_first = np.flatnonzero(group_start)
+    group_of = np.cumsum(group_start) - 1
+    same_poly_next = np.concatenate((corner_poly[1:] == corner_poly[:-1], [False]))
+    next_pos = np.where(same_poly_next, np.arange(len(corners)) + 1, group_first[group_of])
+    side = dist_before[corners[next_pos]] - dist_before[corners]
+    side = np.where(side <= 0, side + perimeter[corner_poly], side)
+    is_side = side >= min_side_fraction * perimeter[corner_poly]
+    side_count = np.bincount(corner_poly, weights=is_side, minlength=n).astype(np.intp)
+    side_sum = np.bincount(corner_poly, weights=side, minlength=n)
+    side_sq = np.bincount(corner_poly, weights=side ** 2, minlength=n)
+    side_mean = side_sum / safe_corners
+    side_std = np.sqrt(np.maximum(side_sq / safe_corners - side_mean ** 2, 0))
+    side_equality = np.where(side_count >= 2,
+                             np.clip(1 - np.divide(side_std, side_mean, out=np.ones(n),
+                                                   where=side_mean > 0), 0, 1), 0.0)
+
+    # Furthest vertex from the centroid bounds the circumscribed circle
+    radius = np.sqrt(np.maximum.reduceat((x - cx[poly_id]) ** 2 + (y - cy[poly_id]) ** 2, starts))
+
+    return {
+        'area': area,
+        'perimeter': perimeter,
+        'corner_count': corner_count,
+        'side_count': side_count,
+        'side_equality': side_equality,
+        'curve_presence': curve_presence,
+        'angle_mean': angle_mean,
+        'angle_std': angle_std,
+        'angle_sum': angle_sum,
+        'isotropy': isotropy,
+        'area_ratio': np.divide(area, np.pi * radius ** 2, out=np.zeros(n), where=radius > 0),
+        'perimeter_ratio': np.divide(4 * np.pi * area, perimeter ** 2, out=np.zeros(n),
+                                     where=perimeter > 0),
+    }
+
+
+def extract_features(vertices, offsets, corner_threshold=20.0):
+    """Ragged polygon batch -> (N, 8) float32 feature matrix in FEATURE_NAMES order
+
+    corner_count/side_count are scaled by MAX_CORNERS, angle_measure is the
+    mean interior corner angle / 180 (1.0 for smooth outlines), symmetry_type
+    is the ratio of the principal second moments (1.0 for radial or regular
+    n-fold shapes), area_ratio is area over the circumscribed circle about
+    the centroid and perimeter_ratio is the isoperimetric quotient.
+
+    A measured square is [0.5, 0, 0.5, 1, 0.5, 1, 0.64, 0.79], not the
+    illustrative [0.9, 0.1, 0.9, 0.9, ...] from script.py, so compare these
+    vectors only with vectors produced here (reference_prototypes()).
+    """
+    g = _geometry(vertices, offsets, corner_threshold)
+    return np.column_stack([
+        np.minimum(g['corner_count'], MAX_CORNERS) / MAX_CORNERS,
+        g['curve_presence'],
+        np.minimum(g['side_count'], MAX_CORNERS) / MAX_CORNERS,
+        g['side_equality'],
+        g['angle_mean'] / 180.0,
+        g['isotropy'],
+        g['area_ratio'],
+        g['perimeter_ratio'],
+    ]).astype(np.float32)
+
+
+def extract_shape_records(vertices, offsets, corner_threshold=20.0, angle_tolerance=1.0):
+    """Ragged polygon batch -> ShapeRecordArray for SymbolicAI.classify_batch"""
+    g = _geometry(vertices, offsets, corner_threshold)
+    n = len(g['area'])
+    records = ShapeRecordArray.empty(n)
+    data = records.data
+    has_corners = g['corner_count'] > 0
+    curved = g['curve_presence'] >= 0.5
+    regular_angles = has_corners & (g['angle_std'] <= angle_tolerance)
+    regular = regular_angles & (g['side_equality'] >= 0.98)
+
+    data['corners'] = np.minimum(g['corner_count'], np.iinfo(np.int16).max)
+    data['curves'] = curved
+    data['equal_sides'] = np.where(g['side_count'] >= 2, g['side_equality'] >= 0.98, MISSING)
+    data['angles'] = np.where(regular_angles, np.rint(g['angle_mean']), MISSING)
+    data['angles_sum'] = np.where(has_corners, np.rint(g['angle_sum']), MISSING)
+
+    symmetry = np.full(n, MISSING)
+    symmetry[~has_corners & curved & (g['isotropy'] >= 0.95)] = SYMMETRY_TYPES.index('radial')
+    symmetry[regular & (g['corner_count'] == 4)] = SYMMETRY_TYPES.index('4-fold')
+    symmetry[regular & (g['corner_count'] == 3)] = SYMMETRY_TYPES.index('3-fold')
+    data['symmetry'] = symmetry
+    return records
+
+
+def regular_polygon(sides, radius=1.0, rotation=0.0, center=(0.0, 0.0)):
+    """Vertices of a regular polygon (use many sides for a sampled circle)"""
+    theta = rotation + 2 * np.pi * np.arange(sides) / sides
+    return np.column_stack((center[0] + radius * np.cos(theta),
+                            center[1] + radius * np.sin(theta)))
+
+
+def reference_polygons():
+    """One clean outline per shape class"""
+    return {
+        'circle': regular_polygon(64),
+        'square': np.array([[0, 0], [1, 0], [1, 1], [0, 1]]),
+        'triangle': regular_polygon(3),
+        'rectangle': np.array([[0, 0], [2, 0], [2, 1], [0, 1]]),
+    }
+
+
+def reference_prototypes(corner_threshold=20.0):
+    """{shape name: feature vector} measured from reference_polygons()
+
+    Use these instead of the script.py example vectors wherever the queries
+    come from extract_features().
+    """
+    polygons = reference_polygons()
+    features = extract_features(*to_ragged(list(polygons.values())), corner_threshold)
+    return dict(zip(polygons, features.tolist()))
+
+
+def benchmark_extraction(n=100_000, seed=0):
+    """Polygons/sec for extract_features on a mixed ragged batch"""
+    import time
+
+    rng = np.random.RandomState(seed)
+    sides = rng.choice([3, 4, 5, 6, 48], size=n)
+    polygons = [regular_polygon(s, rng.uniform(0.5, 5), rng.uniform(0, np.pi)) for s in sides]
+    vertices, offsets = to_ragged(polygons)
+    start = time.perf_counter()
+    extract_features(vertices, offsets)
+    elapsed = time.perf_counter() - start
+    return n / elapsed, len(vertices) / elapsed
+
+
+if __name__ == "__main__":
+    from neural_network import NeuralNetwork
+    from symbolic_ai import SymbolicAI
+
+    # Example usage: a square, a sampled circle and a triangle, then the same
+    # square and triangle as closed rings (first vertex repeated at the end)
+    polygons = [
+        np.array([[0, 0], [2, 0], [2, 2], [0, 2]]),
+        regular_polygon(64),
+        np.array([[0, 0], [4, 0], [1, 3]]),
+        np.array([[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]),
+        np.array([[0, 0], [4, 0], [4, 0], [1, 3], [0, 0]]),
+    ]
+    vertices, offsets = to_ragged(polygons)
+    features = extract_features(vertices, offsets)
+    for row in features:
+        print(dict(zip(FEATURE_NAMES, row.astype(float).round(3).tolist())))
+
+    records = extract_shape_records(vertices, offsets)
+    names, confidences = SymbolicAI().classify_batch(records)
+    print(f"Rules:   {list(names)}")
+    print(f"Network: {NeuralNetwork().predict_proba(features).argmax(axis=1)}")
+
+    polygons_per_sec, vertices_per_sec = benchmark_extraction()
+    print(f"\nThroughput: {polygons_per_sec:,.0f} polygons/sec ({vertices_per_sec:,.0f} vertices/sec)")
@@ -0,0 +1,197 @@
+# COMPACT SHAPE RECORDS - Fixed-schema storage for shape properties
+import numpy as np
+
+# Every property the rulebase can ask about, in storage order
+FIELDS = ('corners', 'curves', 'equal_sides', 'angles', 'angles_sum', 'symmetry')
+
+# Symmetry is stored as a small integer code instead of a string
+SYMMETRY_TYPES = ['radial', '4-fold', '3-fold', '2-fold', 'none']
+
+# Missing properties (dict.get() -> None) are stored as -1
+MISSING = -1
+
+# One packed row per shape: 9 bytes instead of a few hundred for a dict
+SHAPE_DTYPE = np.dtype([
+    ('corners', np.int16),
+    ('curves', np.int8),
+    ('equal_sides', np.int8),
+    ('angles', np.int16),
+    ('angles_sum', np.int16),
+    ('symmetry', np.int8),
+])
+
+_BOOL_FIELDS = ('curves', 'equal_sides')
+
+
+def encode_value(field, value):
+    """Convert a property value to its stored integer code"""
+    if field not in FIELDS:
+        raise KeyError(f"unknown shape property: {field!r}")
+    if value is None:
+        return MISSING
+    if field == 'symmetry':
+        if value not in SYMMETRY_TYPES:
+            raise ValueError(f"symmetry must be one of {SYMMETRY_TYPES}, got {value!r}")
+        return SYMMETRY_TYPES.index(value)
+    if field in _BOOL_FIELDS:
+        if not isinstance(value, (bool, np.bool_)):
+            raise ValueError(f"{field} must be True or False, got {value!r}")
+        return int(value)
+    # Only exact integers, so the compact path never matches where dict == would not
+    try:
+        code = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an integer, got {value!r}") from None
+    if code != value:
+        raise ValueError(f"{field} must be an integer, got {value!r}")
+    info = np.iinfo(SHAPE_DTYPE[field])
+    if not 0 <= code <= info.max:
+        raise ValueError(f"{field} out of range for compact storage: {value!r}")
+    return code
+
+
+def decode_value(field, code):
+    """Convert a stored integer code back to the property value"""
+    code = int(code)
+    if code == MISSING:
+        return None
+    if field == 'symmetry':
+        return SYMMETRY_TYPES[code]
+    if field in _BOOL_FIELDS:
+        return bool(code)
+    return code
+
+
+class ShapeRecord:
+    """Single shape with a fixed set of properties (no per-instance dict)"""
+    __slots__ = FIELDS
+
+    def __init__(self, corners=None, curves=None, equal_sides=None,
+                 angles=None, angles_sum=None, symmetry=None):
+        self.corners = corners
+        self.curves = curves
+        self.equal_sides = equal_sides
+        self.angles = angles
+        self.angles_sum = angles_sum
+        self.symmetry = symmetry
+
+    @classmethod
+    def from_dict(cls, properties):
+        unknown = set(properties) - set(FIELDS)
+        if unknown:
+            raise KeyError(f"unknown shape properties: {sorted(unknown)}")
+        return cls(**properties)
+
+    def get(self, name, default=None):
+        """Dict-style lookup so SymbolicAI.classify works unchanged"""
+        if name not in FIELDS:
+            return default
+        value = getattr(self, name)
+        return default if value is None else value
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in FIELDS
+                if getattr(self, name) is not None}
+
+    def __eq__(self, other):
+        if not isinstance(other, ShapeRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+
+    def __repr__(self):
+        props = ', '.join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"ShapeRecord({props})"
+
+
+class ShapeRecordArray:
+    """Columnar collection of shapes backed by a NumPy structured array"""
+
+    def __init__(self, data):
+        data = np.asarray(data)
+        if data.dtype != SHAPE_DTYPE:
+            raise TypeError(f"expected dtype {SHAPE_DTYPE}, got {data.dtype}")
+        self.data = data
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.full(n, MISSING, dtype=SHAPE_DTYPE))
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from an iterable of dicts and/or ShapeRecords"""
+        records = list(records)
+        array = cls.empty(len(records))
+        for field in FIELDS:
+            array.data[field] = [encode_value(field, r.get(field)) for r in records]
+        return array
+
+    def column(self, field):
+        """Raw encoded column, compare against encode_value(field, value)"""
+        return self.data[field]
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            row = self.data[index]
+            return ShapeRecord(**{f: decode_value(f, row[f]) for f in FIELDS})
+        return ShapeRecordArray(self.data[index])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"ShapeRecordArray({len(self)} shapes, {self.nbytes} bytes)"
+
+
+def benchmark_memory(n=100_000):
+    """Measure bytes per record for dicts, ShapeRecords and ShapeRecordArray"""
+    import tracemalloc
+
+    templates = [
+        {'corners': 4, 'equal_sides': True, 'angles': 90},
+        {'corners': 0, 'curves': True, 'symmetry': 'radial'},
+        {'corners': 3, 'angles_sum': 180},
+    ]
+
+    def measure(build):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        obj = build()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        del obj
+        return size / n
+
+    results = {
+        'dict': measure(lambda: [dict(templates[i % 3]) for i in range(n)]),
+        'ShapeRecord': measure(lambda: [ShapeRecord.from_dict(templates[i % 3]) for i in range(n)]),
+        'ShapeRecordArray': measure(
+            lambda: ShapeRecordArray.from_records(templates[i % 3] for i in range(n))),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    # Example usage
+    square = ShapeRecord.from_dict({'corners': 4, 'equal_sides': True, 'angles': 90})
+    print(square, square.get('corners'), square.get('curves'))
+
+    batch = ShapeRecordArray.from_records([
+        square,
+        {'corners': 0, 'curves': True, 'symmetry': 'radial'},
+        {'corners': 3, 'angles_sum': 180},
+    ])
+    print(batch, batch[1])
+
+    n = 100_000
+    print(f"\nMemory per shape record ({n:,} records):")
+    for name, per_record in benchmark_memory(n).items():
+        print(f"  {name:<17} {per_record:8.1f} bytes")
@@ -0,0 +1,324 @@
+# SHARED MODEL WEIGHTS - Publish networks and rulebases once, attach from every worker
+import json
+import struct
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+from neural_network import DeepNetwork, NeuralNetwork
+from shape_records import FIELDS, ShapeRecordArray, decode_value, encode_value
+from symbolic_ai import SymbolicAI
+
+ALIGNMENT = 64
+_HEADER_LEN = struct.Struct('<Q')
+
+
+def _attach(name):
+    """Open an existing segment without letting this process's tracker unlink it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track flag; skip registration by hand
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class _Pinned:
+    """Array interface for one block of a segment that keeps the segment open
+
+    NumPy does not keep a buffer export on shm.buf, so a plain
+    np.ndarray(buffer=shm.buf) view does not stop the segment from being
+    unmapped under it. Views built from this object hold it as their base,
+    and it holds the SharedMemory, which only unmaps once it is collected.
+    """
+
+    def __init__(self, shm, address, shape, dtype):
+        self.shm = shm
+        dtype = np.dtype(dtype)
+        self.__array_interface__ = {'version': 3, 'data': (address, True), 'shape': tuple(shape),
+                                    'typestr': dtype.str, 'descr': dtype.descr}
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_network(network):
+    """Network -> (metadata, {array name: ndarray})"""
+    if isinstance(network, DeepNetwork):
+        arrays = {}
+        for i, (weights, bias, _) in enumerate(network.layers):
+            arrays[f'layer{i}.weights'] = weights
+            arrays[f'layer{i}.bias'] = bias
+        meta = {'kind': 'deep', 'classes': list(network.classes),
+                'activations': [activation for _, _, activation in network.layers]}
+        return meta, arrays
+    meta = {'kind': 'classic', 'classes': list(network.classes),
+            'temperature': network.temperature}
+    arrays = {name: getattr(network, name) for name in (
+        'weights_input_hidden', 'weights_hidden_output', 'bias_hidden', 'bias_output')}
+    return meta, arrays
+
+
+def encode_rulebase(symbolic):
+    """Rules -> one row per condition: (rule index, field index, expected code)"""
+    conditions = [(rule_idx, FIELDS.index(prop), encode_value(prop, expected))
+                  for rule_idx, rules in enumerate(symbolic.rules.values())
+                  for prop, expected in rules.items()]
+    table = np.array(conditions, dtype=np.int32).reshape(-1, 3)
+    meta = {'shape_names': list(symbolic.rules), 'threshold': symbolic.threshold}
+    return meta, {'rules.conditions': table}
+
+
+class ModelPublisher:
+    """Writes each model version into its own segment and flips a version counter
+
+    Workers read the counter from the `<name>_ctl` segment and attach
+    `<name>_v<version>`. The counter is a single aligned int64 store, so a
+    worker sees either the old or the new version, never a mix. The last
+    `keep` versions stay linked so slow attachers can still open them.
+    """
+
+    def __init__(self, name='ai_demo_model', keep=2):
+        self.name = name
+        self.keep = keep
+        self.control = shared_memory.SharedMemory(name=f'{name}_ctl', create=True, size=8)
+        self.version_counter = np.ndarray((1,), dtype=np.int64, buffer=self.control.buf)
+        self.version_counter[0] = 0
+        self.segments = {}
+
+    def publish(self, network=None, symbolic=None):
+        """Copy weights and rulebase into a new segment, then make it current"""
+        meta, arrays = {'network': None, 'rulebase': None}, {}
+        if network is not None:
+            meta['network'], network_arrays = encode_network(network)
+            arrays.update(network_arrays)
+        if symbolic is not None:
+            meta['rulebase'], rule_arrays = encode_rulebase(symbolic)
+            arrays.update(rule_arrays)
+
+        layout, offset = {}, 0
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout[key] = {'dtype': array.dtype.str, 'shape': array.shape, 'offset': offset}
+            offset = _align(offset + array.nbytes)
+        header = json.dumps({'meta': meta, 'arrays': layout}).encode()
+        data_start = _align(_HEADER_LEN.size + len(header))
+
+        version = int(self.version_counter[0]) + 1
+        shm = shared_memory.SharedMemory(name=f'{self.name}_v{version}', create=True,
+                                         size=max(data_start + offset, 1))
+        _HEADER_LEN.pack_into(shm.buf, 0, len(header))
+        shm.buf[_HEADER_LEN.size:_HEADER_LEN.size + len(header)] = header
+        for key, array in arrays.items():
+            spec = layout[key]
+            view = np.ndarray(spec['shape'], dtype=spec['dtype'], buffer=shm.buf,
+                              offset=data_start + spec['offset'])
+            view[...] = array
+            del view
+        self.segments[version] = shm
+
+        # Atomic swap: readers switch on their next current() call
+        self.version_counter[0] = version
+        for old in [v for v in self.segments if v <= version - self.keep]:
+            self.segments.pop(old).unlink()
+        return version
+
+    def close(self):
+        for shm in self.segments.values():
+            shm.close()
+            shm.unlink()
+        self.segments.clear()
+        del self.version_counter
+        self.control.close()
+        self.control.unlink()
+
+
+class SharedRulebase(SymbolicAI):
+    """SymbolicAI that matches straight from a read-only (rule, field, code) table
+
+    No per-process dict of rules is built: match_scores() compares record
+    columns against the table and sums hits per rule, and every other
+    method (classify, classify_batch, rank, rank_batch) goes through it.
+    """
+
+    def __init__(self, conditions, shape_names, threshold):
+        self.conditions = conditions
+        self.threshold = threshold
+        self._shape_names = list(shape_names)
+        rule_idx = conditions[:, 0]
+        # Conditions grouped by rule: a permutation of the table, not a copy of it
+        self._order = np.argsort(rule_idx, kind='stable')
+        self._counts = np.bincount(rule_idx, minlength=len(self._shape_names))
+        self._starts = np.concatenate(([0], np.cumsum(self._counts)[:-1]))
+
+    @property
+    def shape_names(self):
+        return list(self._shape_names)
+
+    @property
+    def rules(self):
+        """Decoded dict copy of the rulebase, only for inspection or republishing"""
+        rules = {name: {} for name in self._shape_names}
+        for rule_idx, field_idx, code in self.conditions.tolist():
+            field = FIELDS[field_idx]
+            rules[self._shape_names[rule_idx]][field] = decode_value(field, code)
+        return rules
+
+    def match_scores(self, records):
+        if not isinstance(records, ShapeRecordArray):
+            records = ShapeRecordArray.from_records(records)
+        columns = np.stack([records.column(name) for name in FIELDS], axis=1)
+        fields, codes = self.conditions[self._order, 1], self.conditions[self._order, 2]
+        hits = (columns[:, fields] == codes).astype(np.int16)
+        matches = np.zeros((len(records), len(self._shape_names)))
+        present = self._counts > 0
+        if len(fields):
+            matches[:, present] = np.add.reduceat(hits, self._starts[present], axis=1)
+        # Same arithmetic as SymbolicAI.match_scores, so equal scores tie identically
+        return np.divide(matches, self._counts, out=np.zeros_like(matches), where=present) * 100
+
+    def classify(self, shape_properties):
+        """One dict/ShapeRecord -> (shape, confidence); a ShapeRecordArray -> arrays"""
+        if isinstance(shape_properties, ShapeRecordArray):
+            return self.classify_batch(shape_properties)
+        names, confidences = self.classify_batch([shape_properties])
+        return str(names[0]), float(confidences[0])
+
+    def rank(self, shape_properties, k=3):
+        """Top-k (shape, confidence) for one dict/ShapeRecord, best first"""
+        if isinstance(shape_properties, ShapeRecordArray):
+            return self.rank_batch(shape_properties, k)
+        shape_ids, scores = self.rank_batch([shape_properties], k)
+        return [(self._shape_names[i], float(score)) for i, score in zip(shape_ids[0], scores[0])]
+
+
+class SharedModel:
+    """Read-only NumPy views over one published version
+
+    Every view keeps the segment mapped, so networks built by network() stay
+    valid after the subscriber moves on to a newer version; the old segment
+    is unmapped once the last of them is dropped.
+    """
+
+    def __init__(self, shm, version):
+        self.shm = shm
+        self.version = version
+        (header_len,) = _HEADER_LEN.unpack_from(shm.buf, 0)
+        header = json.loads(bytes(shm.buf[_HEADER_LEN.size:_HEADER_LEN.size + header_len]))
+        self.meta = header['meta']
+        data_start = _align(_HEADER_LEN.size + header_len)
+        base = np.frombuffer(shm.buf, dtype=np.uint8).ctypes.data
+        self.arrays = {}
+        self._symbolic = None
+        for key, spec in header['arrays'].items():
+            self.arrays[key] = np.asarray(_Pinned(shm, base + data_start + spec['offset'],
+                                                  spec['shape'], spec['dtype']))
+
+    def network(self):
+        """NeuralNetwork or DeepNetwork whose weights are the shared views (no copy)"""
+        meta = self.meta['network']
+        if meta is None:
+            return None
+        if meta['kind'] == 'deep':
+            return DeepNetwork.from_layers([
+                (self.arrays[f'layer{i}.weights'], self.arrays[f'layer{i}.bias'], activation)
+                for i, activation in enumerate(meta['activations'])
+            ], classes=meta['classes'])
+        network = NeuralNetwork.__new__(NeuralNetwork)
+        for name in ('weights_input_hidden', 'weights_hidden_output', 'bias_hidden', 'bias_output'):
+            setattr(network, name, self.arrays[name])
+        network.classes = meta['classes']
+        network.temperature = meta['temperature']
+        return network
+
+    def symbolic(self):
+        """SharedRulebase over the shared condition table (no copy), built once"""
+        meta = self.meta['rulebase']
+        if meta is None:
+            return None
+        if self._symbolic is None:
+            self._symbolic = SharedRulebase(self.arrays['rules.conditions'],
+                                            meta['shape_names'], meta['threshold'])
+        return self._symbolic
+
+    def close(self):
+        """Drop this handle's views; the segment stays mapped while any network uses it"""
+        self.arrays.clear()
+        self._symbolic = None
+        self.shm = None
+
+
+class ModelSubscriber:
+    """Worker-side handle that follows the publisher's current version"""
+
+    def __init__(self, name='ai_demo_model'):
+        self.name = name
+        self.control = _attach(f'{name}_ctl')
+        self.version_counter = np.ndarray((1,), dtype=np.int64, buffer=self.control.buf)
+        self.model = None
+
+    def current(self):
+        """Attach the latest version if it changed since the last call"""
+        while True:
+            version = int(self.version_counter[0])
+            if version == 0:
+                raise LookupError(f"nothing published under {self.name!r} yet")
+            if self.model is not None and self.model.version == version:
+                return self.model
+            try:
+                shm = _attach(f'{self.name}_v{version}')
+            except FileNotFoundError:
+                continue  # superseded and unlinked between the two reads, try again
+            if self.model is not None:
+                self.model.close()
+            self.model = SharedModel(shm, version)
+            return self.model
+
+    def close(self):
+        if self.model is not None:
+            self.model.close()
+            self.model = None
+        del self.version_counter
+        self.control.close()
+
+
+def _worker_classify(args):
+    name, features = args
+    subscriber = ModelSubscriber(name)
+    model = subscriber.current()
+    label, confidence = model.network().classify(np.asarray(features))
+    rule_label, _ = model.symbolic().classify({'corners': 4, 'equal_sides': True, 'angles': 90})
+    version = model.version
+    del model
+    subscriber.close()
+    return version, label, round(confidence, 1), rule_label
+
+
+if __name__ == "__main__":
+    from multiprocessing import Pool
+
+    # Example usage: publish once, classify from several worker processes
+    publisher = ModelPublisher()
+    try:
+        publisher.publish(NeuralNetwork(), SymbolicAI())
+        features = [0.8, 0.1, 0.7, 0.9, 0.5, 0.2, 0.4, 0.6]
+        with Pool(3) as pool:
+            print(pool.map(_worker_classify, [(publisher.name, features)] * 3))
+
+            # Hot swap: workers pick up version 2 on their next attach
+            subscriber = ModelSubscriber(publisher.name)
+            network = subscriber.current().network()
+            publisher.publish(DeepNetwork([8, 16, 3], seed=7), SymbolicAI(threshold=100))
+            print(pool.map(_worker_classify, [(publisher.name, features)] * 3))
+
+            # A network built from version 1 keeps working after the swap
+            subscriber.current()
+            print(f"Kept v1 network: {network.classify(np.asarray(features))}")
+            del network
+            subscriber.close()
+    finally:
+        publisher.close()
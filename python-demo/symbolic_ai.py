@@ -0,0 +1,137 @@
+# TOP-DOWN APPROACH (Symbolic AI) - Rule-based classifier for dicts and compact records
+import heapq
+
+import numpy as np
+
+import profiling
+from shape_records import ShapeRecordArray, encode_value
+
+
+class SymbolicAI:
+    def __init__(self, threshold=75):
+        # Define explicit rules for each shape
+        self.rules = {
+            'square': {'corners': 4, 'equal_sides': True, 'angles': 90},
+            'circle': {'corners': 0, 'curves': True, 'symmetry': 'radial'},
+            'triangle': {'corners': 3, 'angles_sum': 180}
+        }
+        self.threshold = threshold
+
+    def classify(self, shape_properties):
+        """Classify a dict or ShapeRecord; a ShapeRecordArray goes to classify_batch"""
+        if isinstance(shape_properties, ShapeRecordArray):
+            return self.classify_batch(shape_properties)
+        if profiling.ENABLED:
+            return self._classify_profiled(shape_properties)
+        for shape_name, rules in self.rules.items():
+            matches = sum(1 for rule, expected in rules.items()
+                          if shape_properties.get(rule) == expected)
+            confidence = (matches / len(rules)) * 100
+            if confidence >= self.threshold:
+                return shape_name, confidence
+        return "unknown", 0
+
+    def _classify_profiled(self, shape_properties):
+        for shape_name, rules in self.rules.items():
+            matches = 0
+            for rule, expected in rules.items():
+                with profiling.stage('symbolic.rule_lookup'):
+                    actual = shape_properties.get(rule)
+                with profiling.stage('symbolic.compare'):
+                    matches += actual == expected
+            with profiling.stage('symbolic.confidence'):
+                confidence = (matches / len(rules)) * 100
+            if confidence >= self.threshold:
+                return shape_name, confidence
+        return "unknown", 0
+
+    @property
+    def shape_names(self):
+        """Shape ids used by rank_batch index into this list"""
+        return list(self.rules)
+
+    def match_scores(self, records):
+        """Match percentage of every record against every shape -> (N, shapes)"""
+        if not isinstance(records, ShapeRecordArray):
+            records = ShapeRecordArray.from_records(records)
+        scores = np.zeros((len(records), len(self.rules)))
+        for shape_idx, rules in enumerate(self.rules.values()):
+            matches = np.zeros(len(records), dtype=np.int16)
+            for rule, expected in rules.items():
+                matches += records.column(rule) == encode_value(rule, expected)
+            scores[:, shape_idx] = (matches / len(rules)) * 100
+        return scores
+
+    def classify_batch(self, records):
+        """Vectorized classify over a ShapeRecordArray (or dicts) -> (names, confidences)"""
+        with profiling.stage('symbolic.batch_compare'):
+            scores = self.match_scores(records)
+        with profiling.stage('symbolic.batch_confidence'):
+            passed = scores >= self.threshold
+            # First shape over the threshold wins, same as classify()
+            labels = np.where(passed.any(axis=1), passed.argmax(axis=1), -1)
+            confidences = np.where(labels >= 0, np.take_along_axis(
+                scores, np.maximum(labels, 0)[:, None], axis=1)[:, 0], 0.0)
+
+        # Label -1 indexes the trailing "unknown"
+        names = np.array(self.shape_names + ["unknown"], dtype=object)[labels]
+        return names, confidences
+
+    def rank(self, shape_properties, k=3):
+        """Top-k (shape, confidence) over the whole rulebase, best first"""
+        if isinstance(shape_properties, ShapeRecordArray):
+            return self.rank_batch(shape_properties, k)
+        scored = (
+            (shape_name, (sum(1 for rule, expected in rules.items()
+                              if shape_properties.get(rule) == expected) / len(rules)) * 100)
+            for shape_name, rules in self.rules.items()
+        )
+        # nlargest is stable, so ties keep rulebase order
+        return heapq.nlargest(k, scored, key=lambda item: item[1])
+
+    def rank_batch(self, records, k=3):
+        """Top-k per record -> (N, k) shape ids into shape_names and (N, k) scores"""
+        scores = self.match_scores(records)
+        n, shapes = scores.shape
+        k = min(k, shapes)
+        # k-th best score per row; everything above it is in, and of the shapes
+        # tied at it only the first ones in rulebase order, as in rank()
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > kth
+        tied = scores == kth
+        needed = k - above.sum(axis=1, keepdims=True)
+        selected = above | (tied & (np.cumsum(tied, axis=1) <= needed))
+        top = np.flatnonzero(selected).reshape(n, k) % shapes
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        # Candidates are in rulebase order, so a stable sort keeps ties that way
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+if __name__ == "__main__":
+    from shape_records import ShapeRecord
+
+    # Example usage
+    ai = SymbolicAI()
+    print(ai.classify({'corners': 4, 'equal_sides': True, 'angles': 90}))
+    print(ai.classify(ShapeRecord(corners=0, curves=True, symmetry='radial')))
+
+    batch = ShapeRecordArray.from_records([
+        {'corners': 4, 'equal_sides': True, 'angles': 90},
+        {'corners': 0, 'curves': True, 'symmetry': 'radial'},
+        {'corners': 3, 'angles_sum': 180},
+        {'corners': 5},
+    ])
+    names, confidences = ai.classify(batch)
+    for name, confidence in zip(names, confidences):
+        print(f"Prediction: {name} ({confidence:.1f}% confidence)")
+
+    # Ranked candidates instead of first-over-threshold
+    print(ai.rank({'corners': 4, 'equal_sides': True, 'angles_sum': 180}, k=2))
+    shape_ids, scores = ai.rank_batch(batch, k=2)
+    for ids, row in zip(shape_ids, scores):
+        print([(ai.shape_names[i], round(float(s), 1)) for i, s in zip(ids, row)])
+
+    # Stage timings (run with AI_DEMO_PROFILE=1)
+    if profiling.ENABLED:
+        print(profiling.export_prometheus())
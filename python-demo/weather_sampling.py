@@ -0,0 +1,173 @@
+# STREAMING SAMPLING - Sample a large CSV in bounded memory, reproducible subsets
+import io
+import math
+import random
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+SEASONS = {12: 'winter', 1: 'winter', 2: 'winter', 3: 'spring', 4: 'spring', 5: 'spring',
+           6: 'summer', 7: 'summer', 8: 'summer', 9: 'autumn', 10: 'autumn', 11: 'autumn'}
+
+# Rows per pandas chunk and bytes per block in the stratified path
+CHUNK_ROWS = 1 << 18
+BLOCK_BYTES = 1 << 24
+
+
+def _months(dates):
+    """Month array from YYYYMMDD or YYYY-MM-DD strings, read off the code points"""
+    chars = np.asarray(dates, dtype='U7').view(np.uint32).reshape(len(dates), 7).astype(np.int64)
+    dashed = chars[:, 4] == ord('-')
+    tens = np.where(dashed, chars[:, 5], chars[:, 4]) - ord('0')
+    ones = np.where(dashed, chars[:, 6], chars[:, 5]) - ord('0')
+    months = tens * 10 + ones
+    bad = (tens < 0) | (tens > 9) | (ones < 0) | (ones > 9) | (months < 1) | (months > 12)
+    if bad.any():
+        raise ValueError(f"cannot read a month from date {np.asarray(dates)[bad][0]!r}")
+    return months
+
+
+def _windows(lines, window):
+    """Yield (start row, (row, ..., row + window - 1)) for consecutive data rows"""
+    if window == 1:
+        for row, line in enumerate(lines):
+            yield row, (line,)
+        return
+    buffer = deque(maxlen=window)
+    for row, line in enumerate(lines):
+        buffer.append(line)
+        if len(buffer) == window:
+            yield row - window + 1, tuple(buffer)
+
+
+def _reservoir(units, size, rng):
+    """Algorithm L: uniform sample of `size` units, O(size) memory, few RNG calls"""
+    reservoir = []
+    units = iter(units)
+    for unit in units:
+        reservoir.append(unit)
+        if len(reservoir) == size:
+            break
+    if len(reservoir) < size:
+        return reservoir
+    w = math.exp(math.log(1 - rng.random()) / size)
+    while True:
+        skip = math.floor(math.log(1 - rng.random()) / math.log(1 - w))
+        for _ in range(skip):
+            if next(units, None) is None:
+                return reservoir
+        unit = next(units, None)
+        if unit is None:
+            return reservoir
+        reservoir[rng.randrange(size)] = unit
+        w *= math.exp(math.log(1 - rng.random()) / size)
+
+
+def _bottom_k(keys, rows, strata, size):
+    """Per stratum, the `size` rows with the smallest keys (a uniform sample when keys are)
+
+    `size` is one limit for every stratum or an array of limits by stratum code.
+    """
+    order = np.lexsort((keys, strata))
+    sorted_strata = strata[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_strata, sorted_strata)
+    limit = size[sorted_strata] if np.ndim(size) else size
+    keep = order[rank < limit]
+    return keys[keep], rows[keep], strata[keep]
+
+
+def _read_rows(f, rows):
+    """{row: line} for sorted data-row indices `rows`, found by scanning newlines in byte blocks"""
+    lines, pending, first_row = {}, b'', 0
+    while True:
+        block = f.read(BLOCK_BYTES)
+        data = pending + block
+        ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n'))
+        if not block and data:
+            ends = np.append(ends, len(data))  # last line without a newline
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        lo, hi = np.searchsorted(rows, [first_row, first_row + len(ends)])
+        for row in rows[lo:hi].tolist():
+            i = row - first_row
+            lines[row] = data[starts[i]:ends[i] + 1].decode()
+        if not block:
+            return lines
+        pending = data[ends[-1] + 1:] if len(ends) else data
+        first_row += len(ends)
+
+
+def _to_frame(header, units, columns):
+    """Parse just the sampled rows; `_window` ties together rows of one unit"""
+    units = sorted(units, key=lambda unit: unit[0])
+    text = header + ''.join(line if line.endswith('\n') else line + '\n'
+                            for _, rows in units for line in rows)
+    df = pd.read_csv(io.StringIO(text), usecols=columns)
+    df['_window'] = [start for start, rows in units for _ in rows]
+    return df
+
+
+def sample_csv(csv_path, size, stratify=None, window=1, columns=None,
+               date_column='DATE', seed=0):
+    """Sample `size` units of `window` consecutive rows from a CSV without loading it
+
+    stratify=None draws a reservoir sample. stratify='month' or 'season'
+    reads only the date column, in chunks, gives every unit a random key
+    and keeps the `size` smallest keys per stratum (memory is bounded by
+    size x strata), then allocates `size` across strata in proportion to
+    their row counts. A second pass scans byte blocks for newlines to fetch
+    the chosen rows. Together they cost about one read_csv of the file;
+    the unstratified reservoir is cheaper still.
+    Use window=2 when a target needs the following row (next-day values).
+    Assumes one record per line (no newlines inside quoted fields).
+    """
+    if size < 1:
+        raise ValueError(f"size must be at least 1, got {size!r}")
+    if stratify not in (None, 'month', 'season'):
+        raise ValueError(f"stratify must be None, 'month' or 'season', got {stratify!r}")
+    if stratify is None:
+        with open(csv_path, newline='') as f:
+            header = f.readline()
+            return _to_frame(header, _reservoir(_windows(f, window), size, random.Random(seed)),
+                             columns)
+
+    # Stratum code per month: the month itself, or the index of its season
+    seasons = sorted(set(SEASONS.values()))
+    codes = np.zeros(13, dtype=np.int64)
+    for month, season in SEASONS.items():
+        codes[month] = month if stratify == 'month' else seasons.index(season)
+
+    rng = np.random.default_rng(seed)
+    keys, rows, strata = np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    counts = np.zeros(13, dtype=np.int64)
+    carry, first_row = np.empty(0, dtype=np.int64), 0
+    for chunk in pd.read_csv(csv_path, usecols=[date_column], dtype={date_column: str},
+                             skipinitialspace=True, skip_blank_lines=False,
+                             chunksize=CHUNK_ROWS):
+        # A unit can only start where all `window` rows exist, so the last
+        # window - 1 rows wait for the next chunk
+        chunk_strata = np.concatenate((carry, codes[_months(chunk[date_column])]))
+        complete = max(len(chunk_strata) - (window - 1), 0)
+        carry = chunk_strata[complete:]
+        chunk_strata = chunk_strata[:complete]
+        counts += np.bincount(chunk_strata, minlength=len(counts))
+        keys, rows, strata = _bottom_k(np.concatenate((keys, rng.random(complete))),
+                                       np.concatenate((rows, first_row + np.arange(complete))),
+                                       np.concatenate((strata, chunk_strata)), size)
+        first_row += complete
+
+    # Proportional allocation by largest remainder; the smallest keys of a
+    # stratum's bottom-k are still a uniform sample of that stratum
+    quotas = size * counts / max(counts.sum(), 1)
+    allocation = np.floor(quotas).astype(np.int64)
+    leftover = size - allocation.sum()
+    allocation[np.argsort(allocation - quotas, kind='stable')[:leftover]] += 1
+    _, starts, _ = _bottom_k(keys, rows, strata, allocation)
+    starts = np.sort(starts)
+
+    wanted = np.unique((starts[:, None] + np.arange(window)).ravel())
+    with open(csv_path, 'rb') as f:
+        header = f.readline().decode()
+        lines = _read_rows(f, wanted)
+    units = [(start, tuple(lines[start + i] for i in range(window))) for start in starts.tolist()]
+    return _to_frame(header, units, columns)